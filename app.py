@@ -3,21 +3,110 @@
 # app.py
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit
+from flask import Flask, abort, jsonify, render_template, request, send_file, url_for
+from flask_socketio import SocketIO, emit, join_room
 from server.game_state import PokerGame
+from server.equity import load_equity_table
+from server.bots import BOT_NAMES, BotPool, bot_view, make_bot
+from server.matchmaking import Matchmaker
+from server.analytics import PlayerStats, append_hand
+from server.assets import CACHE_CONTROL, AssetStore
+from server.chat import ChatRoom
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret')
 socketio = SocketIO(app, async_mode="eventlet", cors_allowed_origins="*")
 
-game = PokerGame(starting_stack=1000, small_blind=5, big_blind=10)
+# Preflop equities are precomputed with `python -m server.equity` and memory-mapped here.
+equity_table = load_equity_table(os.environ.get('EQUITY_TABLE_PATH', 'data/preflop_equity.bin'))
+
+game = PokerGame(starting_stack=1000, small_blind=5, big_blind=10, equity_table=equity_table)
+
+# Joiners go through the matchmaking queue. This process runs a single table, so the
+# matchmaker never opens new ones: when it's full, joiners wait for the next free seat.
+STAKES = (game.small_blind, game.big_blind)
+matchmaker = Matchmaker()
+TABLE_ID = matchmaker.add_table(STAKES, game)
+
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Finished hands are appended here; /admin/stats and `python -m server.analytics` read it.
+HAND_HISTORY_PATH = os.environ.get('HAND_HISTORY_PATH', 'data/hand_history.jsonl')
+STATS_CACHE_PATH = HAND_HISTORY_PATH + '.stats.json'
+player_stats = PlayerStats.load(STATS_CACHE_PATH)
+# Reading the history is slow for big files, so it runs on a worker thread and
+# /admin/stats answers with the last results in the meantime.
+stats_results = player_stats.results()
+stats_executor = ThreadPoolExecutor(max_workers=1)
+stats_refresh = None  # Future of the running update
+STATS_CHUNK_HANDS = 5000  # small chunks keep each GIL-holding NumPy step short
+
+# Fingerprinted, pre-compressed copies of static/ built by `python -m server.assets`.
+# Without a build, templates fall back to plain /static URLs.
+assets = AssetStore(os.path.join(app.static_folder, 'dist'))
+
+@app.context_processor
+def asset_helpers():
+    def asset_url(name):
+        built = assets.url_name(name)
+        if built:
+            return url_for('serve_asset', filename=built)
+        return url_for('static', filename=name)
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    found = assets.resolve(filename, request.headers.get('Accept-Encoding', ''))
+    if not found:
+        abort(404)
+    path, encoding, etag, mimetype = found
+
+    resp = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = CACHE_CONTROL
+    return resp
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def require_admin():
+    # admin routes are off unless ADMIN_TOKEN is set
+    if not ADMIN_TOKEN or request.args.get('token') != ADMIN_TOKEN:
+        abort(403)
+
+@app.route('/admin/matchmaking')
+def admin_matchmaking():
+    require_admin()
+    return jsonify(matchmaker.stats())
+
+@app.route('/admin/stats')
+def admin_stats():
+    require_admin()
+    refresh_stats()
+    return jsonify(stats_results)
+
+def refresh_stats():
+    global stats_refresh
+    if stats_refresh is not None and not stats_refresh.done():
+        return
+    stats_refresh = stats_executor.submit(update_stats)
+
+def update_stats():
+    global stats_results
+    try:
+        # only hands appended since the last update are read
+        if player_stats.update(HAND_HISTORY_PATH, chunk_hands=STATS_CHUNK_HANDS):
+            player_stats.save(STATS_CACHE_PATH)
+    except (OSError, ValueError) as e:
+        print("Could not update player stats:", e)
+        return
+    stats_results = player_stats.results()
+
 TURN_SECONDS = 30
 SHOWDOWN_SECONDS = 10
 timer_lock = Lock()
@@ -28,11 +117,30 @@ START_DELAY_SECONDS = 10
 start_lock = Lock()
 start_token = 0
 
+# Chat is scoped to the table's room, rate limited per session and delivered in batches.
+TABLE_ROOM = f"table-{TABLE_ID}"
+CHAT_FLUSH_SECONDS = 0.25
+CHAT_BATCH_SIZE = 20
+chat_room = ChatRoom(history_size=50)
+chat_names = {}  # sid -> name, for everyone who joined the room
+chat_flusher_started = False
+
+# Bots fill empty seats up to BOT_SEATS players while at least one human is seated.
+# Their decisions run on a process pool and must finish well inside TURN_SECONDS.
+BOT_SEATS = int(os.environ.get('BOT_SEATS', 0))
+BOT_STRATEGY = os.environ.get('BOT_STRATEGY', 'equity')
+BOT_DECISION_SECONDS = 2
+BOT_THINK_SECONDS = 1  # don't act instantly, humans should see what happened
+bots = {}  # sid -> Bot
+bot_pool = BotPool()
+
 
 def broadcast_state():
     socketio.emit('state', game.get_public_state())
 
     for sid in list(game.players.keys()):
+        if sid in bots:
+            continue
         socketio.emit('private', game.get_private_state(sid), to=sid)
 
     # If we're in showdown, also send reveal payload
@@ -56,6 +164,10 @@ def start_turn_timer():
             turn_expires_at = None
             return
 
+        if game.current_turn in bots:
+            sid = game.current_turn
+            socketio.start_background_task(run_bot_turn, sid, my_token)
+
     def _tick():
         while True:
             # We'll decide actions inside the lock, but execute them outside.
@@ -108,6 +220,101 @@ def start_turn_timer():
     socketio.start_background_task(_tick)
 
 
+def announce(text):
+    chat_room.system(text)
+
+
+def start_chat_flusher():
+    global chat_flusher_started
+    if chat_flusher_started:
+        return
+    chat_flusher_started = True
+
+    def _flush():
+        while True:
+            socketio.sleep(CHAT_FLUSH_SECONDS)
+            batch = chat_room.take_batch(CHAT_BATCH_SIZE)
+            if batch:
+                socketio.emit('chat_batch', batch, to=TABLE_ROOM)
+
+    socketio.start_background_task(_flush)
+
+
+def run_bot_turn(sid, my_token):
+    if sid not in bots or sid not in game.players:
+        return  # bot left the table before its task started
+
+    view = bot_view(game, sid, budget=BOT_DECISION_SECONDS / 2)
+    future = bot_pool.submit(bots[sid], view)
+
+    # poll instead of future.result(): the event loop must keep serving humans
+    started = time.time()
+    deadline = started + BOT_DECISION_SECONDS
+    while time.time() < deadline:
+        if future.done() and time.time() - started >= BOT_THINK_SECONDS:
+            break
+        socketio.sleep(0.05)
+
+    action, amount = bot_pool.result_or_fallback(future, view['options'])
+
+    with timer_lock:
+        if my_token != turn_token or game.current_turn != sid:
+            return  # turn moved on (timeout, disconnect) while the bot was thinking
+
+    err = apply_action(sid, action, amount)
+    if err:
+        print("Bot action failed:", err)
+
+
+def human_sids():
+    return [sid for sid in list(game.players) + list(game.waiting) if sid not in bots]
+
+
+def fill_bot_seats():
+    if not human_sids():
+        return
+    names = [n for n in BOT_NAMES if n not in [p['name'] for p in game.players.values()] + list(game.waiting.values())]
+    while names and len(game.players) + len(game.waiting) < min(BOT_SEATS, game.max_seats):
+        name = names.pop(0)
+        sid = f"bot-{name}"
+        status, msg = game.add_player(sid, name)
+        if status == "error":
+            break
+        bots[sid] = make_bot(BOT_STRATEGY)
+        matchmaker.table_changed(TABLE_ID)
+        announce(f"🤖 {name} takes a seat.")
+
+
+def remove_bot(sid):
+    bots.pop(sid, None)
+    game.unqueue_player(sid)
+    player = game.remove_player(sid)
+    matchmaker.table_changed(TABLE_ID)
+    if player:
+        announce(f"🤖 {player['name']} leaves the table.")
+
+
+def make_room_for_human():
+    """A full table gives up a bot seat to a human waiting in the matchmaking queue.
+
+    Mid-hand only a bot that hasn't got chips at stake (queued or folded) leaves;
+    otherwise the human waits for the hand to end.
+    """
+    if not matchmaker.bucket(STAKES).requests:
+        return False
+    if matchmaker.count(TABLE_ID) < game.max_seats:
+        return False
+
+    in_hand = game.phase in ['preflop', 'flop', 'turn', 'river']
+    candidates = [sid for sid in game.waiting if sid in bots]
+    candidates += [sid for sid in game.turn_order
+                   if sid in bots and (not in_hand or game.players[sid]['folded'])]
+    if not candidates:
+        return False
+    remove_bot(candidates[0])
+    return True
+
+
 def maybe_schedule_hand_start():
     global start_token
     with start_lock:
@@ -138,48 +345,105 @@ def handle_join(data):
     name = data.get('name', 'Guest')
     sid = request.sid
 
-    status, msg = game.add_player(sid, name)
+    if sid in game.players or sid in game.waiting:
+        emit('error', {'chat': "You're already at the table."}, to=sid)
+        return
 
+    status, msg = matchmaker.enqueue(sid, name, STAKES)
     if status == "error":
         emit('error', {'chat': msg}, to=sid)
         return
 
-    if status == "queued":
-        socketio.emit('chat', f"🕒 {name} is queued to join the next hand.")
-        emit('error', {'chat': msg}, to=sid)
-        broadcast_state()
+    make_room_for_human()
+    placements = matchmaker.drain(STAKES)
+    placed = next((p for p in placements if p['sid'] == sid), None)
+    if placed is None:
+        # still in the matchmaking queue, which holds the name for them
+        join_chat(sid, name)
+        emit('error', {'chat': "Table full, you'll get the next free seat."}, to=sid)
+    elif placed['status'] != "error":
+        join_chat(sid, name)
+    seat_placements(placements)
+
+
+def join_chat(sid, name):
+    """Table chat: join the room under the name the table accepted and catch up."""
+    if sid in chat_names:
         return
+    join_room(TABLE_ROOM)
+    chat_names[sid] = name
+    emit('chat_history', chat_room.recent(), to=sid)
+    start_chat_flusher()
+
+
+def leave_chat(sid):
+    if chat_names.pop(sid, None) is not None:
+        socketio.server.leave_room(sid, TABLE_ROOM, namespace='/')
 
-    # seated
-    socketio.emit('chat', f"🔔 {name} has joined the game.")
+
+def seat_placements(placements):
+    """Announce players the matchmaker just placed and start play if needed."""
+    if not placements:
+        return
+
+    seated_any = False
+    for p in placements:
+        if p['status'] == "error":
+            leave_chat(p['sid'])  # the name they queued with wasn't accepted
+            socketio.emit('error', {'chat': p['msg']}, to=p['sid'])
+        elif p['status'] == "queued":
+            announce(f"🕒 {p['name']} is queued to join the next hand.")
+            socketio.emit('error', {'chat': p['msg']}, to=p['sid'])
+        else:
+            announce(f"🔔 {p['name']} has joined the game.")
+            seated_any = True
+
+    fill_bot_seats()
     broadcast_state()
 
     # if between hands and >=2 players, schedule start
-    maybe_schedule_hand_start()
-    start_turn_timer()
+    if seated_any:
+        maybe_schedule_hand_start()
+        start_turn_timer()
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     sid = request.sid
+    chat_names.pop(sid, None)
+    chat_room.forget(sid)
+    matchmaker.leave(sid)
+    game.unqueue_player(sid)
     player = game.remove_player(sid)
+    matchmaker.table_changed(TABLE_ID)
     if player:
-        socketio.emit('chat', f"❌ {player['name']} has left the game.")
+        announce(f"❌ {player['name']} has left the game.")
+
+        # bots don't play among themselves
+        if not human_sids():
+            for bot_sid in list(bots):
+                remove_bot(bot_sid)
+
         broadcast_state()
-        start_turn_timer()
+        if game.phase == "showdown" and game.last_hand_record:
+            schedule_next_hand()  # their leaving ended the hand
+        else:
+            record_finished_hand()  # hand ended and the table emptied below two players
+        start_turn_timer()  # invalidates the leaver's countdown; a no-op during showdown
+
+    # a seat may have opened up for someone in the matchmaking queue
+    seat_placements(matchmaker.drain(STAKES))
 
 @socketio.on('chat')
 def handle_chat(data):
-    user = (data or {}).get('user', 'Unknown')
-    msg = (data or {}).get('msg', '')
-    msg = msg.strip()
-    if not msg:
+    sid = request.sid
+    user = chat_names.get(sid)  # never trust a client-supplied name
+    if user is None:
         return
 
-    socketio.emit('chat', {
-        'user': user,
-        'msg': msg
-    })
+    ok, err = chat_room.post(sid, user, (data or {}).get('msg', ''))
+    if err:
+        emit('error', {'chat': err}, to=sid)
 
 @socketio.on('action')
 def handle_action(data):
@@ -187,10 +451,15 @@ def handle_action(data):
     action = data.get('type')
     amount = data.get('amount')
 
+    err = apply_action(sid, action, amount)
+    if err:
+        emit('error', {'message': err}, to=sid)
+
+def apply_action(sid, action, amount=None):
+    """Shared by human and bot turns. Returns an error message or None."""
     ok, err = game.process_action(sid, action, amount=amount)
     if not ok:
-        emit('error', {'message': err}, to=sid)
-        return
+        return err
 
     game.advance_turn()
     broadcast_state()
@@ -198,13 +467,31 @@ def handle_action(data):
     # If showdown, wait 10 seconds then start next hand
     if game.phase == "showdown":
         schedule_next_hand()
-        return
+        return None
 
     start_turn_timer()
+    return None
+
+def record_finished_hand():
+    record = game.last_hand_record
+    game.last_hand_record = None
+    if not record:
+        return
+    try:
+        append_hand(HAND_HISTORY_PATH, record)
+    except OSError as e:
+        print("Could not write hand history:", e)
 
 def schedule_next_hand():
+    record_finished_hand()
+
     def _resume():
         socketio.sleep(SHOWDOWN_SECONDS)
+        if game.phase != "showdown":
+            return  # a hand already started (or the table emptied) during the pause
+        # between hands: bots give up seats to humans still queued
+        while make_room_for_human():
+            seat_placements(matchmaker.drain(STAKES))
         if len(game.players) >= 2:
             game.start_next_hand_after_showdown()
             broadcast_state()
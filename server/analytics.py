@@ -0,0 +1,254 @@
+# Player Statistics
+# Computes standard poker stats for every player from the hand history
+# file the app writes (one JSON hand per line, see PokerGame.hand_record):
+#   VPIP, PFR, aggression factor, showdown win % and bb/100.
+#
+# History is streamed in chunks of hands; each chunk is turned into
+# columnar NumPy arrays (one row per action, one row per player-hand) and
+# reduced with bincount group-bys, so files larger than RAM are fine.
+# Totals are plain sums, which makes the cache incremental: only lines
+# appended since the last run are read.
+#
+#   python -m server.analytics data/hand_history.jsonl
+#
+# server/analytics.py
+import argparse
+import json
+import os
+
+import numpy as np
+
+DEFAULT_HISTORY_PATH = os.path.join("data", "hand_history.jsonl")
+CACHE_VERSION = 1
+
+STREETS = {'preflop': 0, 'flop': 1, 'turn': 2, 'river': 3}
+ACTIONS = {'fold': 0, 'check': 1, 'call': 2, 'bet': 3, 'raise': 4}
+CALL, BET, RAISE = ACTIONS['call'], ACTIONS['bet'], ACTIONS['raise']
+
+# per-player running sums
+COLUMNS = ['hands', 'vpip', 'pfr', 'aggressive', 'calls', 'showdowns', 'showdown_wins', 'net_bb']
+
+
+def append_hand(path, record):
+    """Append one finished hand to the history file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def iter_chunks(path, offset=0, chunk_hands=50000):
+    """Yield (records, end_offset) for complete lines starting at byte `offset`."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        records = []
+        while True:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break  # EOF, or a hand still being written: pick it up next time
+            offset += len(line)
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass  # skip corrupt lines rather than failing the whole report
+            if len(records) >= chunk_hands:
+                yield records, offset
+                records = []
+        if records:
+            yield records, offset
+
+
+class PlayerStats:
+    def __init__(self):
+        self.names = []          # player code -> name
+        self.codes = {}          # name -> player code
+        self.totals = {c: np.zeros(0) for c in COLUMNS}
+        self.offset = 0          # bytes of history already counted
+        self.path = None
+
+    def code(self, name):
+        c = self.codes.get(name)
+        if c is None:
+            c = len(self.names)
+            self.codes[name] = c
+            self.names.append(name)
+        return c
+
+    # ---------- Loading ----------
+    def columns(self, records):
+        """Flatten hand records into columnar arrays."""
+        ph_player, ph_net, ph_showdown, ph_won = [], [], [], []
+        act_row, act_street, act_code = [], [], []
+
+        for rec in records:
+            bb = rec.get('big_blind') or 1
+            showdown = set(rec.get('showdown', []))
+            winners = set(rec.get('winners', []))
+            net = rec.get('net', {})
+
+            rows = {}
+            for name in rec.get('players', {}):
+                rows[name] = len(ph_player)
+                ph_player.append(self.code(name))
+                ph_net.append(net.get(name, 0) / bb)
+                ph_showdown.append(name in showdown)
+                ph_won.append(name in winners)
+
+            for street, name, action, _paid in rec.get('actions', []):
+                if name not in rows or action not in ACTIONS:
+                    continue
+                act_row.append(rows[name])
+                act_street.append(STREETS.get(street, 0))
+                act_code.append(ACTIONS[action])
+
+        return {
+            'ph_player': np.array(ph_player, dtype=np.int64),
+            'ph_net': np.array(ph_net, dtype=np.float64),
+            'ph_showdown': np.array(ph_showdown, dtype=bool),
+            'ph_won': np.array(ph_won, dtype=bool),
+            'act_row': np.array(act_row, dtype=np.int64),
+            'act_street': np.array(act_street, dtype=np.int8),
+            'act_code': np.array(act_code, dtype=np.int8),
+        }
+
+    def aggregate(self, cols):
+        """Group-by player over one chunk and add into the running totals."""
+        n_players = len(self.names)
+        player = cols['ph_player']
+        rows = cols['act_row']
+        street, code = cols['act_street'], cols['act_code']
+
+        preflop = street == STREETS['preflop']
+        aggressive = (code == BET) | (code == RAISE)
+        voluntary = preflop & (aggressive | (code == CALL))
+
+        # per player-hand flags: did they VPIP / raise preflop at least once
+        vpip = np.zeros(len(player), dtype=bool)
+        vpip[rows[voluntary]] = True
+        pfr = np.zeros(len(player), dtype=bool)
+        pfr[rows[preflop & aggressive]] = True
+
+        act_player = player[rows]
+
+        def by_player(keys, weights=None):
+            return np.bincount(keys, weights=weights, minlength=n_players).astype(np.float64)
+
+        chunk = {
+            'hands': by_player(player),
+            'vpip': by_player(player, vpip),
+            'pfr': by_player(player, pfr),
+            'aggressive': by_player(act_player, aggressive),
+            'calls': by_player(act_player, code == CALL),
+            'showdowns': by_player(player, cols['ph_showdown']),
+            'showdown_wins': by_player(player, cols['ph_showdown'] & cols['ph_won']),
+            'net_bb': by_player(player, cols['ph_net']),
+        }
+
+        for c in COLUMNS:
+            total = self.totals[c]
+            if len(total) < n_players:
+                total = np.concatenate([total, np.zeros(n_players - len(total))])
+            self.totals[c] = total + chunk[c]
+
+    def update(self, path=DEFAULT_HISTORY_PATH, chunk_hands=50000):
+        """Read hands appended since the last update. Returns how many were added."""
+        if self.path != path or (os.path.exists(path) and os.path.getsize(path) < self.offset):
+            # different or truncated/rotated file: start over
+            self.__init__()
+        self.path = path
+        if not os.path.exists(path):
+            return 0
+
+        added = 0
+        for records, end in iter_chunks(path, self.offset, chunk_hands):
+            self.aggregate(self.columns(records))
+            self.offset = end
+            added += len(records)
+        return added
+
+    # ---------- Results ----------
+    def results(self):
+        t = self.totals
+        hands = t['hands']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vpip = 100 * t['vpip'] / hands
+            pfr = 100 * t['pfr'] / hands
+            af = t['aggressive'] / t['calls']
+            wsd = 100 * t['showdown_wins'] / t['showdowns']
+            bb100 = 100 * t['net_bb'] / hands
+
+        def num(x):
+            return round(float(x), 2) if np.isfinite(x) else None
+
+        return {
+            name: {
+                'hands': int(hands[i]),
+                'vpip': num(vpip[i]),
+                'pfr': num(pfr[i]),
+                'af': num(af[i]),
+                'wsd': num(wsd[i]),
+                'bb_per_100': num(bb100[i]),
+            }
+            for i, name in enumerate(self.names)
+        }
+
+    # ---------- Cache ----------
+    def save(self, cache_path):
+        data = {
+            'version': CACHE_VERSION,
+            'path': self.path,
+            'offset': self.offset,
+            'names': self.names,
+            'totals': {c: self.totals[c].tolist() for c in COLUMNS},
+        }
+        tmp = cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, cache_path)
+
+    @classmethod
+    def load(cls, cache_path):
+        stats = cls()
+        if not os.path.exists(cache_path):
+            return stats
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return stats
+        if data.get('version') != CACHE_VERSION:
+            return stats
+
+        stats.path = data['path']
+        stats.offset = data['offset']
+        stats.names = data['names']
+        stats.codes = {name: i for i, name in enumerate(stats.names)}
+        stats.totals = {c: np.array(data['totals'][c], dtype=np.float64) for c in COLUMNS}
+        return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Player stats from the hand history.")
+    parser.add_argument("history", nargs="?", default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--cache", default=None, help="stats cache file (default: <history>.stats.json)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and re-read everything")
+    parser.add_argument("--chunk", type=int, default=50000, help="hands per chunk")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    cache = args.cache or args.history + ".stats.json"
+    stats = PlayerStats() if args.rebuild else PlayerStats.load(cache)
+    added = stats.update(args.history, chunk_hands=args.chunk)
+    stats.save(cache)
+
+    results = stats.results()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{added} new hands read")
+        print(f"{'player':<20} {'hands':>7} {'vpip':>6} {'pfr':>6} {'af':>6} {'wsd':>6} {'bb/100':>8}")
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        for name, r in sorted(results.items(), key=lambda kv: -kv[1]['hands']):
+            print(f"{name:<20} {r['hands']:>7} {fmt(r['vpip']):>6} {fmt(r['pfr']):>6} "
+                  f"{fmt(r['af']):>6} {fmt(r['wsd']):>6} {fmt(r['bb_per_100']):>8}")
@@ -0,0 +1,193 @@
+# Static Asset Build
+# Fingerprints and pre-compresses the front-end files so they can be served
+# with long-lived immutable cache headers. The build writes, for each asset:
+#   static/dist/game.<hash>.js, .js.gz and (if the brotli package is installed) .js.br
+# plus static/dist/manifest.json mapping "game.js" -> "game.<hash>.js".
+#
+#   python -m server.assets            # build
+#   python -m server.assets --bench    # compare bytes / time per new player
+#
+# server/assets.py
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import time
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is still a big win
+    brotli = None
+
+ASSETS = ['style.css', 'socket.js', 'game.js', 'chat.js']
+STATIC_DIR = 'static'
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST = 'manifest.json'
+
+# preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def fingerprint(name, content):
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    base, ext = os.path.splitext(name)
+    return f"{base}.{digest}{ext}"
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR, names=ASSETS):
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {}
+    written = {MANIFEST}
+
+    for name in names:
+        with open(os.path.join(static_dir, name), 'rb') as f:
+            content = f.read()
+        out = fingerprint(name, content)
+        manifest[name] = out
+
+        variants = {out: content}
+        # mtime=0 keeps the .gz byte-identical between builds
+        variants[out + '.gz'] = gzip.compress(content, compresslevel=9, mtime=0)
+        if brotli:
+            variants[out + '.br'] = brotli.compress(content, quality=11)
+
+        for filename, data in variants.items():
+            with open(os.path.join(dist_dir, filename), 'wb') as f:
+                f.write(data)
+            written.add(filename)
+
+    # drop outputs of previous builds
+    for filename in os.listdir(dist_dir):
+        if filename not in written:
+            os.remove(os.path.join(dist_dir, filename))
+
+    with open(os.path.join(dist_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class AssetStore:
+    """Build output loaded at startup: manifest plus every compressed variant on disk."""
+
+    def __init__(self, dist_dir=DIST_DIR):
+        self.dist_dir = dist_dir
+        self.manifest = {}
+        self.files = {}  # fingerprinted name -> {'mimetype', 'variants': {encoding: (path, etag)}}
+
+        manifest_path = os.path.join(dist_dir, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        for out in self.manifest.values():
+            path = os.path.join(dist_dir, out)
+            if not os.path.exists(path):
+                continue
+            digest = out.rsplit('.', 2)[-2]
+            variants = {None: (path, f"{digest}-identity")}
+            for encoding, suffix in ENCODINGS:
+                if os.path.exists(path + suffix):
+                    variants[encoding] = (path + suffix, f"{digest}-{encoding}")
+            self.files[out] = {
+                'mimetype': mimetypes.guess_type(out)[0] or 'application/octet-stream',
+                'variants': variants,
+            }
+
+    def url_name(self, name):
+        """Fingerprinted file name for a logical asset, or None if it wasn't built."""
+        out = self.manifest.get(name)
+        return out if out in self.files else None
+
+    def resolve(self, filename, accept_encoding=''):
+        """(path, encoding, etag, mimetype) of the best variant the client accepts, or None."""
+        entry = self.files.get(filename)
+        if not entry:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in accepted and encoding in entry['variants']:
+                path, etag = entry['variants'][encoding]
+                return path, encoding, etag, entry['mimetype']
+        path, etag = entry['variants'][None]
+        return path, None, etag, entry['mimetype']
+
+
+def parse_accept_encoding(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(token)
+    return accepted
+
+
+def bench(iterations=50):
+    """Bytes and time for a new player's first page load, plain static vs built assets."""
+    import re
+    from app import app
+
+    client = app.test_client()
+    asset_urls = re.compile(rb'(?:href|src)="(/assets/[^"]+)"')
+
+    def first_visit(urls, headers):
+        total = len(client.get('/').get_data())
+        for url in urls:
+            total += len(client.get(url, headers=headers).get_data())
+        return total
+
+    def timed(urls, headers):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            size = first_visit(urls, headers)
+        return size, (time.perf_counter() - started) / iterations * 1000
+
+    built = [u.decode() for u in asset_urls.findall(client.get('/').get_data())]
+    if not built:
+        print("no built assets found, run `python -m server.assets` first")
+        return
+
+    runs = [
+        ("flask static, uncompressed", [f"/static/{n}" for n in ASSETS], {}),
+        ("built, gzip", built, {'Accept-Encoding': 'gzip'}),
+        ("built, br + gzip", built, {'Accept-Encoding': 'br, gzip'}),
+    ]
+    for label, urls, headers in runs:
+        size, ms = timed(urls, headers)
+        print(f"{label:<28} {size:>7} bytes per new player, {ms:.2f} ms per page load")
+
+    # returning players: everything is immutable, revalidation is a bodiless 304
+    not_modified = 0
+    for url in built:
+        etag = client.get(url, headers={'Accept-Encoding': 'br, gzip'}).headers.get('ETag', '')
+        resp = client.get(url, headers={'Accept-Encoding': 'br, gzip', 'If-None-Match': etag})
+        not_modified += resp.status_code == 304
+    print(f"revalidation: {not_modified}/{len(built)} assets answered 304 Not Modified")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint and pre-compress static assets.")
+    parser.add_argument("--bench", action="store_true", help="measure bytes/time per new player")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.iterations)
+    else:
+        manifest = build()
+        print(f"built {len(manifest)} assets into {DIST_DIR} (brotli: {'yes' if brotli else 'no'})")
+        for name, out in manifest.items():
+            print(f"  {name} -> {out}")
@@ -0,0 +1,171 @@
+# Bot Players
+# Computer opponents that can sit in empty seats of a PokerGame table.
+# Bots answer through the same process_action path as humans; only the
+# decision itself runs elsewhere, on a process pool, so strategies that
+# simulate hands never block the event loop.
+
+# server/bots.py
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from server.game_state import PokerGame
+
+BOT_NAMES = ["Ada", "Bender", "Chip", "Deep Blue", "Eliza", "Hal", "Marvin", "Robby", "Wall-E"]
+
+# evaluator for Monte Carlo inside worker processes (no table state is used)
+_EVAL = PokerGame()
+
+
+# ---------- Strategies ----------
+class Bot:
+    """Base strategy. decide() gets a plain dict (see bot_view) and returns (action, amount).
+
+    The default checks when it can, otherwise calls; subclasses override decide().
+    """
+
+    def decide(self, view):
+        options = view['options']
+        if options.get('check'):
+            return 'check', None
+        if options.get('call'):
+            return 'call', None
+        return 'fold', None
+
+
+class PassiveBot(Bot):
+    """Checks when it can, otherwise calls. Cheap and never times out."""
+
+
+class EquityBot(Bot):
+    """Compares hand equity with pot odds; bets or raises with strong hands."""
+
+    def __init__(self, aggression=0.65, samples=400, max_bet_bbs=4):
+        self.aggression = aggression
+        self.samples = samples
+        self.max_bet_bbs = max_bet_bbs  # stop re-raising past this many big blinds per street
+
+    def decide(self, view):
+        options = view['options']
+        equity = view.get('equity')
+        if equity is None:
+            equity = self.simulate_equity(view)
+
+        to_call = options.get('to_call', 0)
+        pot_odds = to_call / (view['pot'] + to_call) if to_call else 0
+
+        capped = view['current_bet'] >= self.max_bet_bbs * view['big_blind']
+        if equity >= self.aggression and not capped:
+            if options.get('bet'):
+                return 'bet', options.get('bet_amount')
+            if options.get('raise'):
+                return 'raise', options.get('raise_by')
+        if options.get('check'):
+            return 'check', None
+        if options.get('call') and equity >= pot_odds:
+            return 'call', None
+        return 'fold', None
+
+    def simulate_equity(self, view):
+        """Monte Carlo equity vs random hands, stopping early if the budget runs out."""
+        hand, board = view['hand'], view['community_cards']
+        opponents = max(1, view['opponents'])
+        rest = [c for c in _EVAL.create_deck() if c not in hand and c not in board]
+        stop_at = time.time() + view['budget']
+
+        won = 0.0
+        played = 0
+        for _ in range(self.samples):
+            if time.time() >= stop_at:
+                break
+            drawn = random.sample(rest, 2 * opponents + 5 - len(board))
+            full_board = board + drawn[2 * opponents:]
+            mine = _EVAL.best_hand_rank(hand + full_board)[0]
+            best_other = max(
+                _EVAL.best_hand_rank(drawn[k:k + 2] + full_board)[0]
+                for k in range(0, 2 * opponents, 2)
+            )
+            if mine > best_other:
+                won += 1
+            elif mine == best_other:
+                won += 0.5
+            played += 1
+        return won / played if played else 0.5
+
+
+BOT_STRATEGIES = {
+    'passive': PassiveBot,
+    'equity': EquityBot,
+}
+
+
+def make_bot(strategy='equity'):
+    return BOT_STRATEGIES.get(strategy, EquityBot)()
+
+
+# ---------- Decisions ----------
+def bot_view(game, sid, budget):
+    """Snapshot of what a bot may see. Plain data so it can cross process boundaries."""
+    player = game.players[sid]
+    view = {
+        'hand': list(player['hand']),
+        'community_cards': list(game.community_cards),
+        'phase': game.phase,
+        'pot': game.pot,
+        'current_bet': game.current_bet,
+        'big_blind': game.big_blind,
+        'stack': player['stack'],
+        'options': game.legal_actions(sid),
+        'opponents': game.count_active_not_folded() - 1,
+        'budget': budget,
+        'equity': None,
+    }
+    # preflop equity is an O(1) table lookup, so do it here instead of simulating
+    if game.phase == 'preflop' and game.equity_table:
+        view['equity'] = game.equity_table.hand_equity(player['hand'], game.count_active_not_folded())
+    return view
+
+
+def fallback_action(options):
+    """Cheap default when a bot misses its deadline or answers with something illegal."""
+    if options.get('check'):
+        return 'check', None
+    return 'fold', None
+
+
+def _decide(bot, view):
+    return bot.decide(view)
+
+
+class BotPool:
+    """Runs bot decisions on worker processes. Shared by every table."""
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, bot, view):
+        try:
+            return self.executor.submit(_decide, bot, view)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM-killed); start a fresh pool and retry once
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor.submit(_decide, bot, view)
+
+    def result_or_fallback(self, future, options):
+        """Decision if it is ready and legal, otherwise the fallback. Never waits."""
+        if not future.done():
+            future.cancel()
+            return fallback_action(options)
+        try:
+            action, amount = future.result()
+        except Exception as e:
+            print("Bot decision failed:", e)
+            return fallback_action(options)
+        if not options.get(action):
+            return fallback_action(options)
+        return action, amount
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
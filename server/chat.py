@@ -0,0 +1,79 @@
+# Table Chat
+# Per-table chat state: a ring buffer of recently delivered messages replayed to
+# new joiners, a token bucket per session against spam, and a bounded
+# outbox that the app flushes in batches (one emit per tick), so a chat
+# flood can't crowd game-state emits off the event loop.
+
+# server/chat.py
+import time
+from collections import deque
+
+MAX_MESSAGE_LENGTH = 300
+
+
+class TokenBucket:
+    def __init__(self, rate=1.0, burst=5, clock=time.monotonic):
+        self.rate = rate      # tokens added per second
+        self.burst = burst    # bucket size
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.warned = False   # a rejection was already reported since the last allowed call
+
+    def allow(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.warned = False
+            return True
+        return False
+
+
+class ChatRoom:
+    def __init__(self, history_size=50, max_pending=200, rate=1.0, burst=5):
+        self.history = deque(maxlen=history_size)
+        self.pending = deque(maxlen=max_pending)  # oldest undelivered messages drop first
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # sid -> TokenBucket
+
+    def post(self, sid, user, msg):
+        """Queue a player's message. Returns (ok, error)."""
+        msg = (msg or '').strip()[:MAX_MESSAGE_LENGTH]
+        if not msg:
+            return False, None
+
+        bucket = self.buckets.get(sid)
+        if bucket is None:
+            bucket = self.buckets[sid] = TokenBucket(self.rate, self.burst)
+        if not bucket.allow():
+            if bucket.warned:
+                return False, None  # already told them; further spam is dropped silently
+            bucket.warned = True
+            return False, "You're sending messages too fast"
+
+        self._queue({'user': user, 'msg': msg})
+        return True, None
+
+    def system(self, text):
+        """Join / leave style notices; not rate limited."""
+        self._queue(text)
+
+    def _queue(self, message):
+        self.pending.append(message)
+
+    def take_batch(self, max_messages=20):
+        batch = []
+        while self.pending and len(batch) < max_messages:
+            batch.append(self.pending.popleft())
+        # history only holds delivered messages: a joiner gets the rest with the next batch
+        self.history.extend(batch)
+        return batch
+
+    def recent(self):
+        return list(self.history)
+
+    def forget(self, sid):
+        self.buckets.pop(sid, None)
@@ -0,0 +1,246 @@
+# Preflop Equity Table
+# This module builds and reads a precomputed table of preflop equities.
+# The 169 starting-hand classes (pairs, suited, offsuit) are simulated once
+# with the evaluator from game_state.py and written to a binary file that the
+# server memory-maps at startup, so lookups never run Monte Carlo on the event loop.
+#
+# Generate it with:
+#   python -m server.equity --trials 2000
+#
+# server/equity.py
+import argparse
+import itertools
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from multiprocessing import Pool, cpu_count
+
+from server.game_state import PokerGame
+
+DEFAULT_PATH = os.path.join("data", "preflop_equity.bin")
+
+MAGIC = b"PKEQ"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI")  # magic, version, max_players, trials
+FLOAT = struct.Struct("<f")
+
+NUM_CLASSES = 169
+RANK_CHARS = "23456789TJQKA"
+SUITS = ["S", "H", "D", "C"]
+
+# one evaluator instance is enough: the hand-ranking methods don't touch table state
+_EVAL = PokerGame()
+_CARDS = {_EVAL._card_to_rank_suit(c): c for c in _EVAL.create_deck()}
+
+
+# ---------- Hand classes ----------
+# Classes live on the usual 13x13 grid (A first): pairs on the diagonal,
+# suited hands above it and offsuit hands below it.
+def _grid(rank):
+    return 14 - rank
+
+def class_index(high, low, suited):
+    if high < low:
+        high, low = low, high
+    hi, lo = _grid(high), _grid(low)
+    if high == low:
+        return hi * 13 + hi
+    if suited:
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+def class_of(index):
+    """Return (high_rank, low_rank, suited) for a class index."""
+    row, col = divmod(index, 13)
+    if row == col:
+        return 14 - row, 14 - row, False
+    if row < col:
+        return 14 - row, 14 - col, True
+    return 14 - col, 14 - row, False
+
+def class_label(index):
+    high, low, suited = class_of(index)
+    label = RANK_CHARS[high - 2] + RANK_CHARS[low - 2]
+    if high == low:
+        return label
+    return label + ("s" if suited else "o")
+
+def hand_class(hand):
+    """Class index of a two-card hand (unicode cards), or None."""
+    if not hand or len(hand) != 2:
+        return None
+    (r1, s1), (r2, s2) = (_EVAL._card_to_rank_suit(c) for c in hand)
+    return class_index(r1, r2, s1 == s2)
+
+
+# ---------- Generator ----------
+def _sample_class(index, dead, rng):
+    """Pick concrete cards for a hand class that don't collide with dead cards."""
+    high, low, suited = class_of(index)
+    if suited:
+        options = [(s, s) for s in SUITS]
+    elif high == low:
+        options = list(itertools.combinations(SUITS, 2))
+    else:
+        options = [(a, b) for a in SUITS for b in SUITS if a != b]
+
+    rng.shuffle(options)
+    for s1, s2 in options:
+        c1, c2 = _CARDS[(high, s1)], _CARDS[(low, s2)]
+        if c1 not in dead and c2 not in dead:
+            return [c1, c2]
+    return None
+
+def _showdown_shares(hands, board):
+    ranks = [_EVAL.best_hand_rank(h + board)[0] for h in hands]
+    best = max(ranks)
+    winners = [i for i, r in enumerate(ranks) if r == best]
+    return winners, 1.0 / len(winners)
+
+def _heads_up_row(args):
+    """Equity of class i against every class j >= i."""
+    i, trials, seed = args
+    rng = random.Random(seed)
+    deck = _EVAL.create_deck()
+    row = {}
+
+    for j in range(i, NUM_CLASSES):
+        won = 0.0
+        played = 0
+        for _ in range(trials):
+            hero = _sample_class(i, (), rng)
+            villain = _sample_class(j, hero, rng)
+            if villain is None:
+                continue  # e.g. AA vs AA with no suits left - impossible combo
+            dead = set(hero) | set(villain)
+            board = rng.sample([c for c in deck if c not in dead], 5)
+            winners, share = _showdown_shares([hero, villain], board)
+            if 0 in winners:
+                won += share
+            played += 1
+        row[j] = won / played if played else 0.5
+    return i, row
+
+def _vs_field(args):
+    """Equity of class i against (num_players - 1) random hands."""
+    i, num_players, trials, seed = args
+    rng = random.Random(seed)
+    deck = _EVAL.create_deck()
+    won = 0.0
+
+    for _ in range(trials):
+        hero = _sample_class(i, (), rng)
+        rest = [c for c in deck if c not in hero]
+        drawn = rng.sample(rest, 2 * (num_players - 1) + 5)
+        hands = [hero] + [drawn[k:k + 2] for k in range(0, 2 * (num_players - 1), 2)]
+        board = drawn[-5:]
+        winners, share = _showdown_shares(hands, board)
+        if 0 in winners:
+            won += share
+    return i, num_players, won / trials
+
+def generate(path=DEFAULT_PATH, trials=2000, max_players=4, processes=None, seed=1303):
+    heads_up = array("f", [0.0] * (NUM_CLASSES * NUM_CLASSES))
+    field = array("f", [0.0] * (NUM_CLASSES * (max_players - 1)))
+
+    hu_jobs = [(i, trials, seed + i) for i in range(NUM_CLASSES)]
+    field_jobs = [
+        (i, n, trials, seed + n * 1000 + i)
+        for n in range(2, max_players + 1)
+        for i in range(NUM_CLASSES)
+    ]
+
+    with Pool(processes or cpu_count()) as pool:
+        done = 0
+        for i, row in pool.imap_unordered(_heads_up_row, hu_jobs):
+            for j, eq in row.items():
+                if i == j:
+                    eq = 0.5  # same class on both sides is symmetric by definition
+                heads_up[i * NUM_CLASSES + j] = eq
+                heads_up[j * NUM_CLASSES + i] = 1.0 - eq
+            done += 1
+            print(f"heads-up rows {done}/{NUM_CLASSES}", end="\r", flush=True)
+        print()
+
+        for i, n, eq in pool.imap_unordered(_vs_field, field_jobs):
+            field[(n - 2) * NUM_CLASSES + i] = eq
+        print(f"field equities for 2..{max_players} players done")
+
+    if sys.byteorder != "little":
+        heads_up.byteswap()
+        field.byteswap()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, max_players, trials))
+        heads_up.tofile(f)
+        field.tofile(f)
+    os.replace(tmp, path)
+    print(f"wrote {path}")
+
+
+# ---------- Reader ----------
+class EquityTable:
+    """Read-only, memory-mapped view of a generated equity file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.max_players, self.trials = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: unsupported equity file (version {version})")
+
+        self._hu_offset = HEADER.size
+        self._field_offset = self._hu_offset + NUM_CLASSES * NUM_CLASSES * FLOAT.size
+        expected = self._field_offset + NUM_CLASSES * (self.max_players - 1) * FLOAT.size
+        if len(self._mm) != expected:
+            self._mm.close()
+            raise ValueError(f"{path}: truncated equity file")
+
+    def heads_up(self, hero_class, villain_class):
+        offset = self._hu_offset + (hero_class * NUM_CLASSES + villain_class) * FLOAT.size
+        return FLOAT.unpack_from(self._mm, offset)[0]
+
+    def vs_field(self, hero_class, num_players):
+        num_players = max(2, min(num_players, self.max_players))
+        offset = self._field_offset + ((num_players - 2) * NUM_CLASSES + hero_class) * FLOAT.size
+        return FLOAT.unpack_from(self._mm, offset)[0]
+
+    def hand_equity(self, hand, num_players):
+        """Preflop equity of unicode hole cards against random hands, or None."""
+        cls = hand_class(hand)
+        if cls is None:
+            return None
+        return self.vs_field(cls, num_players)
+
+    def close(self):
+        self._mm.close()
+
+
+def load_equity_table(path=DEFAULT_PATH):
+    """Map the equity file if it exists; the game runs without hints otherwise."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return EquityTable(path)
+    except (OSError, ValueError) as e:
+        print("Equity table not loaded:", e)
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the preflop equity table.")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--trials", type=int, default=2000, help="Monte Carlo trials per cell")
+    parser.add_argument("--max-players", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    generate(args.out, trials=args.trials, max_players=args.max_players, processes=args.processes)
@@ -5,13 +5,24 @@
 # server/game_state.py
 import random
 import itertools
+import time
 from collections import Counter
 
+HAND_NAMES = [
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush",
+]
+
 class PokerGame:
-    def __init__(self, starting_stack=1000, small_blind=5, big_blind=10):
+    def __init__(self, starting_stack=1000, small_blind=5, big_blind=10, equity_table=None,
+                 max_seats=4, hints=True):
         self.starting_stack = starting_stack
         self.small_blind = small_blind
         self.big_blind = big_blind
+        self.max_seats = max_seats
+        self.hints = hints  # per-street made hand / outs hints (headless tables can skip them)
+
+        self.equity_table = equity_table  # optional precomputed preflop equities (server/equity.py)
 
         self.players = {}      # sid -> dict(name, hand, folded, stack)
         self.turn_order = []   # list of sids in seat order (join order)
@@ -22,6 +33,11 @@ class PokerGame:
         self.hand_start_pending = False
 
         self.waiting = {}  # (players waiting to be seated next hand)
+        self.waiting_stacks = {}  # sid -> stack carried in (e.g. tournament table moves)
+
+        # hand history: the last finished hand's record, for the app to store
+        self.hand_number = 0
+        self.last_hand_record = None
 
 
 
@@ -59,8 +75,13 @@ class PokerGame:
 
         self.last_showdown = None  # message for UI
 
+        # sid -> {'rank', 'best5', 'outs'}; updated street by street in advance_phase
+        self.hand_hints = {}
+
+        self.hand_record = None  # history of the running hand (see start_hand)
+
     # ---------- Players ----------
-    def add_player(self, sid, name):
+    def add_player(self, sid, name, stack=None):
         # name must be unique across seated + waiting
         taken_names = [p['name'] for p in self.players.values()] + list(self.waiting.values())
         if name in taken_names:
@@ -73,12 +94,14 @@ class PokerGame:
             return ("ok", "already_waiting")
 
         # table full?
-        if len(self.players) >= 4:
+        if len(self.players) >= self.max_seats:
             return ("error", "Table full")
 
         # mid-hand: queue them
         if self.phase in ['preflop', 'flop', 'turn', 'river']:
             self.waiting[sid] = name
+            if stack is not None:
+                self.waiting_stacks[sid] = stack
             return ("queued", "Game in progress")
 
         # between hands: seat immediately
@@ -86,7 +109,7 @@ class PokerGame:
             'name': name,
             'hand': [],
             'folded': False,
-            'stack': self.starting_stack,
+            'stack': self.starting_stack if stack is None else stack,
         }
         self.turn_order.append(sid)
         return ("ok", "seated")
@@ -97,22 +120,34 @@ class PokerGame:
             return
 
         for sid, name in list(self.waiting.items()):
-            if len(self.players) >= 4:
+            if len(self.players) >= self.max_seats:
                 break
             # seat them
             self.players[sid] = {
                 'name': name,
                 'hand': [],
                 'folded': False,
-                'stack': self.starting_stack,
+                'stack': self.waiting_stacks.pop(sid, self.starting_stack),
             }
             self.turn_order.append(sid)
             del self.waiting[sid]
 
+    def unqueue_player(self, sid):
+        """Drop a player from the waiting list. Returns (name, stack) or None."""
+        if sid not in self.waiting:
+            return None
+        name = self.waiting.pop(sid)
+        return name, self.waiting_stacks.pop(sid, self.starting_stack)
+
     def remove_player(self, sid):
         if sid not in self.players:
             return None
         player = self.players.pop(sid)
+        # chips they put in stay in the pot; keep their result for the hand history
+        rec = self.hand_record
+        if rec is not None and player['name'] in rec['players']:
+            rec.setdefault('net', {})[player['name']] = player['stack'] - rec['players'][player['name']]
+
         if sid in self.turn_order:
             idx = self.turn_order.index(sid)
             self.turn_order.pop(idx)
@@ -170,6 +205,16 @@ class PokerGame:
         for sid in seats:
             self.players[sid]['hand'] = [self.deck.pop(), self.deck.pop()]
 
+        self.hand_number += 1
+        self.hand_record = {
+            'hand': self.hand_number,
+            'time': time.time(),
+            'small_blind': self.small_blind,
+            'big_blind': self.big_blind,
+            'players': {self.players[sid]['name']: self.players[sid]['stack'] for sid in seats},
+            'actions': [],  # [street, name, action, chips put in]
+        }
+
         # post blinds and set turn
         self.post_blinds_and_set_turn()
 
@@ -228,6 +273,11 @@ class PokerGame:
     def count_active_not_folded(self):
         return len(self.active_sids(include_folded=False))
 
+    def contender_sids(self):
+        """Players still in the hand, all-in players included."""
+        return [sid for sid in self.turn_order
+                if sid in self.players and self.players[sid]['hand'] and not self.players[sid]['folded']]
+
     # ---------- Betting rules / actions ----------
     def to_call(self, sid):
         return max(0, self.current_bet - self.street_bets.get(sid, 0))
@@ -259,6 +309,15 @@ class PokerGame:
         return {**actions, **actions_meta}
 
     def process_action(self, sid, action, amount=None):
+        pot_before = self.pot
+        ok, err = self._apply_action(sid, action, amount)
+        if ok and self.hand_record is not None:
+            self.hand_record['actions'].append(
+                [self.phase, self.players[sid]['name'], action, self.pot - pot_before]
+            )
+        return ok, err
+
+    def _apply_action(self, sid, action, amount=None):
         if sid != self.current_turn:
             return False, "Not your turn"
         if sid not in self.players or self.players[sid]['folded']:
@@ -329,7 +388,8 @@ class PokerGame:
     def betting_round_complete(self):
         active = self.active_sids(include_folded=False)
         if len(active) <= 1:
-            return True
+            # nobody left to bet against; a lone stack only has to answer an all-in
+            return all(self.street_bets.get(sid, 0) >= self.current_bet for sid in active)
 
         # everyone must have acted since last aggression, and matched current_bet
         for sid in active:
@@ -341,7 +401,7 @@ class PokerGame:
 
     def advance_turn(self):
         # if only one player left, award pot and go to showdown pause
-        if self.count_active_not_folded() <= 1 and self.phase in ['preflop', 'flop', 'turn', 'river']:
+        if len(self.contender_sids()) <= 1 and self.phase in ['preflop', 'flop', 'turn', 'river']:
             self.award_pot_to_last_player()
             self.phase = "showdown"
             self.current_turn = None
@@ -350,6 +410,9 @@ class PokerGame:
         # if betting round complete: move phase / showdown
         if self.phase in ['preflop', 'flop', 'turn', 'river'] and self.betting_round_complete():
             self.advance_phase()
+            # all-in: nobody can bet any more, so deal the rest of the board and show down
+            while self.phase in ['flop', 'turn', 'river'] and self.count_active_not_folded() <= 1:
+                self.advance_phase()
             return
 
         next_sid = self.next_active_sid(self.current_turn)
@@ -385,6 +448,9 @@ class PokerGame:
             self.current_turn = None
             return
 
+        if self.hints:
+            self.update_hand_hints()
+
         # new betting street
         self.reset_street_bets()
         self.current_turn = self.first_to_act_postflop()
@@ -398,7 +464,7 @@ class PokerGame:
         self.start_hand()
 
     def award_pot_to_last_player(self):
-        active = self.active_sids(include_folded=False)
+        active = self.contender_sids()
         if not active:
             return
         winner = active[0]
@@ -421,8 +487,23 @@ class PokerGame:
         }
 
         self.pot = 0
+        self.finish_hand_record([winner], showdown=[])
 
 
+    def finish_hand_record(self, winners, showdown):
+        rec = self.hand_record
+        self.hand_record = None
+        if rec is None:
+            return
+        rec['board'] = list(self.community_cards)
+        rec['winners'] = [self.players[sid]['name'] for sid in winners]
+        rec['showdown'] = [self.players[sid]['name'] for sid in showdown]
+        net = rec.setdefault('net', {})  # players who left mid-hand are already in here
+        for p in self.players.values():
+            if p['name'] in rec['players']:
+                net[p['name']] = p['stack'] - rec['players'][p['name']]
+        self.last_hand_record = rec
+
     # ---------- Public / Private state ----------
     def get_public_state(self):
         dealer_sid = self.turn_order[self.dealer_index % len(self.turn_order)] if self.turn_order else None
@@ -452,11 +533,27 @@ class PokerGame:
         if sid not in self.players:
             return {}
         options = self.legal_actions(sid) if self.phase in ['preflop', 'flop', 'turn', 'river'] else {}
-        return {
+        state = {
             'hand': self.players[sid]['hand'],
             'options': options
         }
 
+        # preflop hint: O(1) table lookup, never simulated on the request path
+        if self.phase == 'preflop' and self.equity_table and not self.players[sid]['folded']:
+            equity = self.equity_table.hand_equity(self.players[sid]['hand'], self.count_active_not_folded())
+            if equity is not None:
+                state['equity'] = round(equity, 3)
+
+        # postflop hint: already computed when the street was dealt
+        hint = self.hand_hints.get(sid)
+        if hint and self.phase in ['flop', 'turn', 'river'] and not self.players[sid]['folded']:
+            state['hint'] = {
+                'made': HAND_NAMES[hint['rank'][0]],
+                'outs': hint['outs'],
+            }
+
+        return state
+
     # ---------- Hand evaluation ----------
     # Mapping unicode card -> (rank, suit)
     # ranks: 2..14 (Ace=14)
@@ -571,10 +668,120 @@ class PokerGame:
                 best_combo = list(combo)
         return best, best_combo
 
+    # ---------- Hand hints ----------
+    def _has_straight(self, ranks):
+        if 14 in ranks:
+            ranks = ranks | {1}  # wheel
+        return any(all(high - k in ranks for k in range(5)) for high in range(14, 4, -1))
+
+    def _hand_category(self, parsed, rank_counts, suit_counts):
+        """Category (0..8, see HAND_NAMES) of the best 5 out of 5-7 parsed cards."""
+        flush_suit = None
+        for suit, n in suit_counts.items():
+            if n >= 5:
+                flush_suit = suit
+        if flush_suit and self._has_straight({r for r, s in parsed if s == flush_suit}):
+            return 8
+
+        counts = sorted(rank_counts.values(), reverse=True) + [0]
+        if counts[0] >= 4:
+            return 7
+        if counts[0] == 3 and counts[1] >= 2:
+            return 6
+        if flush_suit:
+            return 5
+        if self._has_straight({r for r, n in rank_counts.items() if n}):
+            return 4
+        if counts[0] == 3:
+            return 3
+        if counts[0] == 2 and counts[1] == 2:
+            return 2
+        if counts[0] == 2:
+            return 1
+        return 0
+
+    def update_hand_hints(self):
+        """Refresh each live player's best made hand and outs for the new street.
+
+        The made hand is kept from the previous street and only 5-card combos
+        that use a newly dealt card are ranked. Outs are counted on rank/suit
+        counts built once from the board, so each unseen card costs O(1) per
+        player instead of a full re-evaluation. A card only counts as an out if
+        it lifts the player above what the board plus that card makes alone
+        (pairing the board or a fourth suited board card helps everyone).
+        """
+        board = self.community_cards
+        if len(board) < 3:
+            self.hand_hints = {}
+            return
+
+        new_cards = board if len(board) == 3 else board[-1:]
+        old_board = [c for c in board if c not in new_cards]
+
+        # board-level work, done once per street and shared by every player
+        parse = {c: self._card_to_rank_suit(c) for c in self.create_deck()}
+        board_parsed = [parse[c] for c in board]
+        board_ranks = Counter(r for r, _ in board_parsed)
+        board_suits = Counter(s for _, s in board_parsed)
+        board_unseen = [c for c in parse if c not in board]
+        draw_more = len(board) < 5
+
+        # category the board makes on its own with each possible next card
+        board_with = {}
+        if draw_more:
+            for card in board_unseen:
+                r, s = parse[card]
+                board_ranks[r] += 1
+                board_suits[s] += 1
+                board_with[card] = self._hand_category(board_parsed + [(r, s)], board_ranks, board_suits)
+                board_ranks[r] -= 1
+                board_suits[s] -= 1
+
+        hints = {}
+        for sid, p in self.players.items():
+            if p['folded'] or len(p['hand']) != 2:
+                continue
+
+            prev = self.hand_hints.get(sid)
+            if len(board) == 3 or prev is None:
+                best, best5 = self.best_hand_rank(p['hand'] + board)
+            else:
+                best, best5 = prev['rank'], prev['best5']
+                known = p['hand'] + old_board
+                for card in new_cards:
+                    for four in itertools.combinations(known, 4):
+                        combo = list(four) + [card]
+                        r = self._rank_5(combo)
+                        if r > best:
+                            best, best5 = r, combo
+                    known = known + [card]
+
+            outs = 0
+            if draw_more:
+                hole = [parse[c] for c in p['hand']]
+                parsed = board_parsed + hole
+                ranks = board_ranks + Counter(r for r, _ in hole)
+                suits = board_suits + Counter(s for _, s in hole)
+                for card in board_unseen:
+                    if card in p['hand']:
+                        continue
+                    r, s = parse[card]
+                    ranks[r] += 1
+                    suits[s] += 1
+                    category = self._hand_category(parsed + [(r, s)], ranks, suits)
+                    if category > best[0] and category > board_with[card]:
+                        outs += 1
+                    ranks[r] -= 1
+                    suits[s] -= 1
+
+            hints[sid] = {'rank': best, 'best5': best5, 'outs': outs}
+
+        self.hand_hints = hints
+
     def handle_showdown(self):
         self.last_showdown_payload = None
 
-        active = self.active_sids(include_folded=False)
+        active = self.contender_sids()
         if not active:
             self.pot = 0
             self.last_showdown = "No active players at showdown."
@@ -587,8 +794,13 @@ class PokerGame:
         ranks = {}
         best5 = {}
         for sid in active:
-            seven = self.players[sid]['hand'] + self.community_cards
-            r, combo = self.best_hand_rank(seven)
+            hint = self.hand_hints.get(sid)
+            if hint and len(self.community_cards) == 5:
+                # already evaluated incrementally when the river was dealt
+                r, combo = hint['rank'], hint['best5']
+            else:
+                seven = self.players[sid]['hand'] + self.community_cards
+                r, combo = self.best_hand_rank(seven)
             ranks[sid] = r
             best5[sid] = combo or []
 
@@ -623,3 +835,4 @@ class PokerGame:
         }
 
         self.pot = 0
+        self.finish_hand_record(winners, showdown=active)
@@ -0,0 +1,221 @@
+# Matchmaking
+# Global join queue for a multi-table deployment. Join requests wait in a
+# priority queue per stakes level and are seated into the fullest compatible
+# table that still has a free seat (a new table is opened if none has one).
+#
+# Both the request queue and the "open tables" set are heaps with lazy
+# deletion, so enqueueing, cancelling and seating are O(log n).
+
+# server/matchmaking.py
+import heapq
+import itertools
+import time
+from collections import deque
+
+from server.game_state import PokerGame
+
+
+class StakeBucket:
+    def __init__(self, stakes):
+        self.stakes = stakes
+        self.queue = []          # (priority, enqueued_at, seq, sid)
+        self.requests = {}       # sid -> {'name', 'priority', 'enqueued_at', 'seq'}
+        self.names = {}          # name -> sid, for queued requests
+        self.seated = {}         # name -> table_id, for players seated or waiting at these tables
+        self.open_tables = []    # (-players, table_id) for tables that may have a free seat
+        self.waits = deque(maxlen=1000)  # recent wait times in seconds
+
+
+class Matchmaker:
+    def __init__(self, table_factory=None, max_tables=None, clock=time.time):
+        # table_factory(stakes) -> PokerGame; None means never open tables on demand
+        self.table_factory = table_factory
+        self.max_tables = max_tables
+        self.clock = clock
+
+        self.buckets = {}        # stakes -> StakeBucket
+        self.tables = {}         # table_id -> PokerGame
+        self.table_stakes = {}   # table_id -> stakes
+        self.table_names = {}    # table_id -> names seated or waiting there
+        self.pushed = {}         # table_id -> player count of its newest open_tables entry
+        self.requested = {}      # sid -> stakes (for cancelling)
+        self.next_table_id = 1
+        self._seq = itertools.count()
+
+    def bucket(self, stakes):
+        if stakes not in self.buckets:
+            self.buckets[stakes] = StakeBucket(stakes)
+        return self.buckets[stakes]
+
+    # ---------- Tables ----------
+    def add_table(self, stakes, game):
+        tid = self.next_table_id
+        self.next_table_id += 1
+        self.tables[tid] = game
+        self.table_stakes[tid] = stakes
+        self.table_changed(tid)
+        return tid
+
+    def open_table(self, stakes):
+        sb, bb = stakes
+        game = self.table_factory(stakes) if self.table_factory else PokerGame(small_blind=sb, big_blind=bb)
+        return self.add_table(stakes, game)
+
+    def can_open_table(self):
+        if self.table_factory is None:
+            return False
+        return self.max_tables is None or len(self.tables) < self.max_tables
+
+    def count(self, tid):
+        game = self.tables[tid]
+        return len(game.players) + len(game.waiting)
+
+    def table_changed(self, tid):
+        """Call whenever players join/leave a table outside the matchmaker."""
+        game = self.tables[tid]
+        bucket = self.bucket(self.table_stakes[tid])
+        self._update_names(bucket, tid, {p['name'] for p in game.players.values()} | set(game.waiting.values()))
+
+        n = self.count(tid)
+        if n >= game.max_seats:
+            self.pushed.pop(tid, None)  # its entry goes stale and may be dropped
+        elif self.pushed.get(tid) != n:
+            heapq.heappush(bucket.open_tables, (-n, tid))
+            self.pushed[tid] = n
+
+            # stale entries only leave the heap when they reach the top; compact now and then
+            if len(bucket.open_tables) > 4 * len(self.tables) + 64:
+                self._compact(bucket)
+
+    def _compact(self, bucket):
+        bucket.open_tables = []
+        for tid, stakes in self.table_stakes.items():
+            n = self.count(tid)
+            if stakes == bucket.stakes and n < self.tables[tid].max_seats:
+                bucket.open_tables.append((-n, tid))
+                self.pushed[tid] = n
+        heapq.heapify(bucket.open_tables)
+
+    def _update_names(self, bucket, tid, names):
+        old = self.table_names.get(tid, set())
+        for name in old - names:
+            if bucket.seated.get(name) == tid:
+                del bucket.seated[name]
+        for name in names - old:
+            bucket.seated[name] = tid
+        self.table_names[tid] = names
+
+    def close_table(self, tid):
+        if tid in self.tables:
+            self._update_names(self.bucket(self.table_stakes[tid]), tid, set())
+        self.table_names.pop(tid, None)
+        self.pushed.pop(tid, None)
+        self.tables.pop(tid, None)
+        self.table_stakes.pop(tid, None)
+
+    def _fullest_open(self, bucket):
+        while bucket.open_tables:
+            neg, tid = bucket.open_tables[0]
+            if tid in self.tables:
+                n = self.count(tid)
+                if -neg == n and n < self.tables[tid].max_seats:
+                    return tid
+            heapq.heappop(bucket.open_tables)  # stale: count changed, table full or closed
+        return None
+
+    # ---------- Queue ----------
+    def enqueue(self, sid, name, stakes, priority=0):
+        """Lower priority values are seated first; ties go to whoever asked first."""
+        if sid in self.requested:
+            return ("ok", "already_queued")
+        bucket = self.bucket(stakes)
+        if name in bucket.names or name in bucket.seated:
+            return ("error", "Name taken")
+
+        now = self.clock()
+        seq = next(self._seq)
+        bucket.requests[sid] = {'name': name, 'priority': priority, 'enqueued_at': now, 'seq': seq}
+        bucket.names[name] = sid
+        heapq.heappush(bucket.queue, (priority, now, seq, sid))
+        self.requested[sid] = stakes
+        return ("ok", "queued")
+
+    def leave(self, sid):
+        """Cancel a pending request. The heap entry is dropped lazily."""
+        stakes = self.requested.pop(sid, None)
+        if stakes is None:
+            return False
+        req = self.buckets[stakes].requests.pop(sid, None)
+        if req:
+            self.buckets[stakes].names.pop(req['name'], None)
+        return True
+
+    def _next_request(self, bucket):
+        while bucket.queue:
+            _, _, seq, sid = bucket.queue[0]
+            req = bucket.requests.get(sid)
+            if req and req['seq'] == seq:
+                return sid
+            heapq.heappop(bucket.queue)
+        return None
+
+    def drain(self, stakes):
+        """Seat as many queued players as there are seats. Returns a list of placements."""
+        bucket = self.bucket(stakes)
+        placements = []
+        while True:
+            sid = self._next_request(bucket)
+            if sid is None:
+                break
+
+            tid = self._fullest_open(bucket)
+            if tid is None:
+                if not self.can_open_table():
+                    break
+                tid = self.open_table(stakes)
+
+            heapq.heappop(bucket.queue)
+            req = bucket.requests.pop(sid)
+            bucket.names.pop(req['name'], None)
+            self.requested.pop(sid, None)
+
+            status, msg = self.tables[tid].add_player(sid, req['name'])
+            if status != "error":
+                bucket.waits.append(self.clock() - req['enqueued_at'])
+            self.table_changed(tid)
+            placements.append({
+                'sid': sid,
+                'name': req['name'],
+                'table_id': tid,
+                'status': status,
+                'msg': msg,
+            })
+        return placements
+
+    def drain_all(self):
+        placements = []
+        for stakes in list(self.buckets):
+            placements += self.drain(stakes)
+        return placements
+
+    # ---------- Stats ----------
+    def stats(self):
+        out = {}
+        for stakes, bucket in self.buckets.items():
+            waits = sorted(bucket.waits)
+            out[f"{stakes[0]}/{stakes[1]}"] = {
+                'queued': len(bucket.requests),
+                'tables': sum(1 for s in self.table_stakes.values() if s == stakes),
+                'wait_p50': percentile(waits, 50),
+                'wait_p90': percentile(waits, 90),
+                'wait_p99': percentile(waits, 99),
+                'seated_recently': len(waits),
+            }
+        return out
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[k], 3)
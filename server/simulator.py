@@ -0,0 +1,153 @@
+# Headless Simulator
+# Plays PokerGame hands without Flask / Socket.IO, driving the same
+# process_action / advance_turn calls the app makes for human actions.
+# Used to exercise the tournament layer at scale:
+#
+#   python -m server.simulator --entrants 5000 --seats 9
+#
+# server/simulator.py
+import argparse
+import random
+import time
+
+from server.game_state import PokerGame
+from server.tournament import BETTING_PHASES, Tournament
+
+
+def random_policy(rng):
+    """Loose-passive random player: mostly checks/calls, sometimes bets, folds to pressure."""
+    def choose(game, sid):
+        options = game.legal_actions(sid)
+        if options.get('bet') and rng.random() < 0.2:
+            return 'bet', options['bet_amount']
+        if options.get('raise') and rng.random() < 0.1:
+            return 'raise', options['raise_by']
+        if options.get('check'):
+            return 'check', None
+        if rng.random() < 0.25:
+            return 'fold', None
+        return 'call', None
+    return choose
+
+
+def play_hand(game, policy, max_actions=500):
+    """Play one hand from start_hand to showdown. Returns False if no hand could start."""
+    if game.phase == 'showdown':
+        game.start_next_hand_after_showdown()
+    else:
+        game.start_hand()
+    if game.phase not in BETTING_PHASES:
+        return False
+
+    for _ in range(max_actions):
+        if game.phase not in BETTING_PHASES:
+            return True
+        sid = game.current_turn
+        if sid is None:
+            game.advance_turn()
+            continue
+        action, amount = policy(game, sid)
+        ok, err = game.process_action(sid, action, amount=amount)
+        if not ok:
+            ok, err = game.process_action(sid, 'fold')
+            if not ok:
+                raise RuntimeError(f"stuck hand: {err}")
+        game.advance_turn()
+    raise RuntimeError("hand did not finish")
+
+
+def total_chips(tournament):
+    chips = 0
+    for game in tournament.tables.values():
+        chips += sum(p['stack'] for p in game.players.values())
+        chips += sum(game.waiting_stacks.get(sid, game.starting_stack) for sid in game.waiting)
+        chips += game.pot
+    return chips
+
+
+def simulate_tournament(entrants=1000, seats=9, starting_stack=1500, level_hands=10, seed=0,
+                        max_rounds=100000, verbose=False):
+    rng = random.Random(seed)
+    random.seed(seed)  # deck shuffles use the global generator
+    policy = random_policy(rng)
+
+    # one simulated "round" (every table plays a hand) advances the clock by a minute
+    now = [0.0]
+    tournament = Tournament(
+        starting_stack=starting_stack,
+        seats_per_table=seats,
+        level_seconds=60 * level_hands,
+        clock=lambda: now[0],
+    )
+    tournament.table_factory = lambda: PokerGame(
+        starting_stack=starting_stack,
+        small_blind=tournament.blinds()[0],
+        big_blind=tournament.blinds()[1],
+        max_seats=seats,
+        hints=False,
+    )
+    for i in range(entrants):
+        tournament.register(f"p{i}", f"Player {i}")
+    tournament.start()
+
+    expected_chips = entrants * starting_stack
+    stats = {'hands': 0, 'rounds': 0, 'max_spread': 0, 'max_table': 0, 'boundary_seconds': 0.0}
+    started = time.perf_counter()
+
+    while tournament.winner is None and stats['rounds'] < max_rounds:
+        stats['rounds'] += 1
+        now[0] += 60
+        for tid in list(tournament.tables):
+            if tid not in tournament.tables:
+                continue  # broken earlier this round
+            if not play_hand(tournament.tables[tid], policy):
+                continue
+            stats['hands'] += 1
+
+            t = time.perf_counter()
+            tournament.hand_finished(tid)
+            stats['boundary_seconds'] += time.perf_counter() - t
+
+            if tournament.winner is not None:
+                break
+
+        if tournament.winner is not None:
+            break
+
+        # invariants after every round (every table is between hands here)
+        chips = total_chips(tournament)
+        if chips != expected_chips:
+            raise AssertionError(f"chips not conserved: {chips} != {expected_chips}")
+        counts = [tournament.count(tid) for tid in tournament.tables]
+        if max(counts) > seats:
+            raise AssertionError(f"table over capacity: {max(counts)} > {seats}")
+        stats['max_table'] = max(stats['max_table'], max(counts))
+        stats['max_spread'] = max(stats['max_spread'], max(counts) - min(counts))
+
+        if verbose and stats['rounds'] % 50 == 0:
+            print(f"round {stats['rounds']}: {tournament.remaining()} left on "
+                  f"{len(tournament.tables)} tables, blinds {tournament.blinds()}")
+
+    stats['elapsed'] = time.perf_counter() - started
+    stats['winner'] = tournament.entrants.get(tournament.winner)
+    stats['moves'] = tournament.moves
+    stats['tables_broken'] = tournament.tables_broken
+    return tournament, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a headless multi-table tournament.")
+    parser.add_argument("--entrants", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=9)
+    parser.add_argument("--stack", type=int, default=1500)
+    parser.add_argument("--level-hands", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t, stats = simulate_tournament(args.entrants, args.seats, args.stack, args.level_hands,
+                                   args.seed, verbose=True)
+    per_boundary = stats['boundary_seconds'] / max(1, stats['hands']) * 1e6
+    print(f"winner: {stats['winner']} after {stats['hands']} hands / {stats['rounds']} rounds")
+    print(f"moves: {stats['moves']}, tables broken: {stats['tables_broken']}, "
+          f"max table size: {stats['max_table']}, max spread between tables: {stats['max_spread']}")
+    print(f"hand_finished: {per_boundary:.1f} us avg, total run {stats['elapsed']:.1f}s")
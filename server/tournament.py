@@ -0,0 +1,269 @@
+# Multi-Table Tournament
+# Runs many PokerGame tables as one tournament: escalating blinds,
+# eliminations when a stack hits zero, and table balancing / breaking.
+#
+# Tables are kept in two heaps keyed by player count (lazy deletion), so
+# finding the smallest / largest table is O(log n) instead of scanning
+# every table. Players only ever move when their table is between hands:
+# the driver calls hand_finished(table_id) after handle_showdown /
+# award_pot_to_last_player, and that is the only place seats change.
+
+# server/tournament.py
+import heapq
+import math
+import random
+import time
+
+from server.game_state import PokerGame
+
+# (small_blind, big_blind) per level
+BLIND_LEVELS = [
+    (10, 20), (15, 30), (25, 50), (50, 100), (75, 150), (100, 200),
+    (150, 300), (200, 400), (300, 600), (400, 800), (500, 1000),
+    (750, 1500), (1000, 2000), (1500, 3000), (2000, 4000), (3000, 6000),
+    (5000, 10000), (7500, 15000), (10000, 20000),
+]
+
+BETTING_PHASES = ['preflop', 'flop', 'turn', 'river']
+
+
+class Tournament:
+    def __init__(self, starting_stack=1500, seats_per_table=9, blind_levels=None,
+                 level_seconds=600, table_factory=None, clock=time.time):
+        self.starting_stack = starting_stack
+        self.seats_per_table = seats_per_table
+        self.blind_levels = blind_levels or BLIND_LEVELS
+        self.level_seconds = level_seconds
+        self.table_factory = table_factory or self.default_table
+        self.clock = clock
+
+        self.entrants = {}      # sid -> name
+        self.locations = {}     # sid -> table_id
+        self.tables = {}        # table_id -> PokerGame
+        self.eliminated = []    # sids in elimination order (first out first)
+        self.winner = None
+        self.started_at = None
+        self.next_table_id = 1
+
+        self.moves = 0
+        self.tables_broken = 0
+
+        # (count, table_id) and (-count, table_id); stale entries are skipped lazily
+        self._min_heap = []
+        self._max_heap = []
+
+    def default_table(self):
+        sb, bb = self.blinds()
+        return PokerGame(starting_stack=self.starting_stack, small_blind=sb, big_blind=bb,
+                         max_seats=self.seats_per_table)
+
+    # ---------- Registration / start ----------
+    def register(self, sid, name):
+        if self.started_at is not None:
+            return ("error", "Tournament already started")
+        if sid in self.entrants:
+            return ("ok", "already_registered")
+        if name in self.entrants.values():
+            return ("error", "Name taken")
+        self.entrants[sid] = name
+        return ("ok", "registered")
+
+    def start(self):
+        """Open just enough tables and deal everyone into them round-robin."""
+        self.started_at = self.clock()
+        sids = list(self.entrants)
+        random.shuffle(sids)
+
+        num_tables = max(1, math.ceil(len(sids) / self.seats_per_table))
+        table_ids = [self.open_table() for _ in range(num_tables)]
+        for i, sid in enumerate(sids):
+            tid = table_ids[i % num_tables]
+            self.tables[tid].add_player(sid, self.entrants[sid])
+            self.locations[sid] = tid
+
+        for tid in table_ids:
+            self._push(tid)
+        return table_ids
+
+    def open_table(self):
+        tid = self.next_table_id
+        self.next_table_id += 1
+        self.tables[tid] = self.table_factory()
+        return tid
+
+    # ---------- Blinds ----------
+    def level(self):
+        if self.started_at is None:
+            return 0
+        elapsed = self.clock() - self.started_at
+        return min(int(elapsed // self.level_seconds), len(self.blind_levels) - 1)
+
+    def blinds(self):
+        return self.blind_levels[self.level()]
+
+    # ---------- Counts / heaps ----------
+    def remaining(self):
+        return len(self.entrants) - len(self.eliminated)
+
+    def tables_needed(self):
+        return max(1, math.ceil(self.remaining() / self.seats_per_table))
+
+    def count(self, tid):
+        game = self.tables[tid]
+        return len(game.players) + len(game.waiting)
+
+    def _push(self, tid):
+        n = self.count(tid)
+        heapq.heappush(self._min_heap, (n, tid))
+        heapq.heappush(self._max_heap, (-n, tid))
+
+        # stale entries only leave the heap when they reach the top; compact now and then
+        if len(self._min_heap) > 4 * len(self.tables) + 64:
+            self._min_heap = [(self.count(t), t) for t in self.tables]
+            self._max_heap = [(-self.count(t), t) for t in self.tables]
+            heapq.heapify(self._min_heap)
+            heapq.heapify(self._max_heap)
+
+    def _peek(self, heap, sign, exclude=None):
+        """Valid (count, table_id) at the top of a heap, skipping `exclude`."""
+        skipped = []
+        found = None
+        while heap:
+            key, tid = heap[0]
+            if tid not in self.tables or sign * key != self.count(tid):
+                heapq.heappop(heap)
+                continue
+            if tid == exclude:
+                skipped.append(heapq.heappop(heap))
+                continue
+            found = (sign * key, tid)
+            break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    def smallest_table(self, exclude=None):
+        return self._peek(self._min_heap, 1, exclude)
+
+    def largest_table(self, exclude=None):
+        return self._peek(self._max_heap, -1, exclude)
+
+    # ---------- Hand boundary ----------
+    def at_boundary(self, tid):
+        return self.tables[tid].phase not in BETTING_PHASES
+
+    def hand_finished(self, tid):
+        """Call after every hand on a table. Eliminates, updates blinds, then balances.
+
+        Returns the list of (sid, from_table, to_table) moves made.
+        """
+        if not self.at_boundary(tid):
+            raise RuntimeError(f"table {tid} is still in a hand")
+
+        game = self.tables[tid]
+        for sid in list(game.players):
+            if game.players[sid]['stack'] <= 0:
+                self.eliminate(tid, sid)
+
+        if self.remaining() <= 1:
+            self.finish()
+            return []
+
+        game.small_blind, game.big_blind = self.blinds()
+        self._push(tid)
+
+        moves = []
+        # break the smallest table as soon as it is between hands
+        if len(self.tables) > self.tables_needed():
+            smallest = self.smallest_table()
+            if smallest and self.at_boundary(smallest[1]):
+                moves += self.break_table(smallest[1])
+
+        # then even out this table against the smallest other one
+        if tid in self.tables:
+            while True:
+                other = self.smallest_table(exclude=tid)
+                if other is None or self.count(tid) <= other[0] + 1:
+                    break
+                sid = self.player_to_move(tid)
+                moves.append(self.move_player(sid, tid, other[1]))
+
+            # and, if the largest table also happens to be between hands, pull from it
+            while True:
+                other = self.largest_table(exclude=tid)
+                if other is None or other[0] <= self.count(tid) + 1 or not self.at_boundary(other[1]):
+                    break
+                sid = self.player_to_move(other[1])
+                moves.append(self.move_player(sid, other[1], tid))
+        return moves
+
+    def eliminate(self, tid, sid):
+        self.tables[tid].remove_player(sid)
+        self.locations.pop(sid, None)
+        self.eliminated.append(sid)
+
+    def finish(self):
+        # locations only holds players still in
+        self.winner = next(iter(self.locations), None)
+        self.tables = {}
+        self._min_heap, self._max_heap = [], []
+
+    def player_to_move(self, tid):
+        """Prefer someone not dealt in yet, then whoever would post the big blind next."""
+        game = self.tables[tid]
+        if game.waiting:
+            return next(iter(game.waiting))
+        if len(game.turn_order) >= 3:
+            dealer = game.turn_order[(game.dealer_index + 1) % len(game.turn_order)]
+            bb = game.next_active_sid(game.next_active_sid(dealer))
+            if bb:
+                return bb
+        return game.turn_order[-1]
+
+    def move_player(self, sid, from_tid, to_tid):
+        source = self.tables[from_tid]
+        if not self.at_boundary(from_tid):
+            raise RuntimeError(f"cannot move {sid}: table {from_tid} is mid-hand")
+
+        queued = source.unqueue_player(sid)
+        if queued:
+            name, stack = queued
+        else:
+            player = source.remove_player(sid)
+            name, stack = player['name'], player['stack']
+
+        # destination may be mid-hand: add_player queues them for its next hand
+        status, msg = self.tables[to_tid].add_player(sid, name, stack=stack)
+        if status == "error":
+            raise RuntimeError(f"cannot seat {sid} at table {to_tid}: {msg}")
+
+        self.locations[sid] = to_tid
+        self.moves += 1
+        self._push(from_tid)
+        self._push(to_tid)
+        return sid, from_tid, to_tid
+
+    def break_table(self, tid):
+        game = self.tables[tid]
+        moves = []
+        for sid in list(game.waiting) + list(game.turn_order):
+            target = self.smallest_table(exclude=tid)
+            if target is None:
+                break
+            moves.append(self.move_player(sid, tid, target[1]))
+
+        if self.count(tid) == 0:
+            del self.tables[tid]
+            self.tables_broken += 1
+        return moves
+
+    # ---------- Reporting ----------
+    def standings(self):
+        """sid -> finishing place (1 = winner)."""
+        places = {}
+        if self.winner:
+            places[self.winner] = 1
+        total = len(self.entrants)
+        for i, sid in enumerate(self.eliminated):
+            places[sid] = total - i
+        return places
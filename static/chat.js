@@ -18,7 +18,7 @@ document.addEventListener('DOMContentLoaded', () => {
   sendBtn.addEventListener('click', () => {
       const msg = chatInput.value;
       if (msg.trim() !== '') {
-        socket.emit('chat', { user: playerName, msg });
+        socket.emit('chat', { msg });
         chatInput.value = '';
       }
   });
@@ -33,9 +33,25 @@ document.addEventListener('DOMContentLoaded', () => {
 
   // Listen for incoming chat messages
   socket.on('chat', data => {
+    appendMessage(data);
+    messages.scrollTop = messages.scrollHeight;
+  });
+
+  // Server batches messages under load, and replays recent ones when we join
+  socket.on('chat_batch', batch => {
+    (batch || []).forEach(appendMessage);
+    messages.scrollTop = messages.scrollHeight;
+  });
+
+  socket.on('chat_history', history => {
+    (history || []).forEach(appendMessage);
+    messages.scrollTop = messages.scrollHeight;
+  });
+
+  function appendMessage(data) {
     const msgDiv = document.createElement('div');
 
-    // data can be {user, msg} or a plain string (fallback)
+    // data can be {user, msg} or a plain string (system notices)
     if (typeof data === 'string') {
       msgDiv.textContent = data;
     } else {
@@ -45,8 +61,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     messages.appendChild(msgDiv);
-    messages.scrollTop = messages.scrollHeight;
-  });
+  }
 
   socket.on('error', data => {
     if (!data) return;
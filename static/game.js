@@ -17,6 +17,7 @@ document.addEventListener('DOMContentLoaded', () => {
     myHand = data.hand || [];
     myOptions = data.options || {};
     renderMyHand();
+    renderHandHint(data);
     updateActionButtons();
   });
 
@@ -195,6 +196,19 @@ document.addEventListener('DOMContentLoaded', () => {
     renderCards(myHand, handDiv);
   }
 
+  function renderHandHint(data) {
+    const hintEl = document.getElementById('handHint');
+    if (!hintEl) return;
+    if (typeof data.equity === 'number') {
+      hintEl.textContent = `Equity: ${Math.round(data.equity * 100)}%`;
+    } else if (data.hint) {
+      const outs = data.hint.outs ? ` · ${data.hint.outs} outs` : '';
+      hintEl.textContent = `${data.hint.made}${outs}`;
+    } else {
+      hintEl.textContent = '';
+    }
+  }
+
   function updateActionButtons() {
     const checkBtn = document.getElementById('checkBtn');
     const betBtn = document.getElementById('betBtn');